@@ -1,9 +1,21 @@
 # ----------------------------
 # IMPORTS Y CONFIGURACIÓN GLOBAL
 # ----------------------------
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import math
 import os
+import queue
+import random
+import signal
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from functools import wraps
 from dotenv import load_dotenv
 
 # Flask app imports
@@ -16,10 +28,6 @@ from flask import send_from_directory
 import mysql.connector
 from mysql.connector import Error
 
-# Logging único para todo el archivo
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger("app_mysql")
-
 # Cargar .env
 load_dotenv()
 
@@ -35,6 +43,185 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 # Campos requeridos para el API Flask
 CAMPOS_PERFIL_REQUERIDOS = ['nombre', 'email', 'contraseña']
 
+# Control de admisión para endpoints con bcrypt (capacidad, recarga por segundo)
+ADMISION_CLIENTE_CAPACIDAD = int(os.getenv("ADMISION_CLIENTE_CAPACIDAD", "10"))
+ADMISION_CLIENTE_RECARGA = float(os.getenv("ADMISION_CLIENTE_RECARGA", "0.5"))
+ADMISION_CUENTA_CAPACIDAD = int(os.getenv("ADMISION_CUENTA_CAPACIDAD", "5"))
+ADMISION_CUENTA_RECARGA = float(os.getenv("ADMISION_CUENTA_RECARGA", "0.1"))
+ADMISION_MAX_CONCURRENTES = int(os.getenv("ADMISION_MAX_CONCURRENTES", "4"))
+ADMISION_RETRY_SATURADO = int(os.getenv("ADMISION_RETRY_SATURADO", "1"))
+ADMISION_MAX_CLAVES = int(os.getenv("ADMISION_MAX_CLAVES", "100000"))
+
+if min(ADMISION_CLIENTE_CAPACIDAD, ADMISION_CUENTA_CAPACIDAD, ADMISION_MAX_CONCURRENTES,
+       ADMISION_RETRY_SATURADO, ADMISION_MAX_CLAVES) < 1:
+    raise ValueError("Las capacidades y límites de ADMISION_* deben ser >= 1")
+if min(ADMISION_CLIENTE_RECARGA, ADMISION_CUENTA_RECARGA) <= 0:
+    raise ValueError("ADMISION_CLIENTE_RECARGA y ADMISION_CUENTA_RECARGA deben ser > 0")
+
+# Escritura diferida (group commit) del historial de hábitos
+HISTORIAL_ESCRITURA_DIFERIDA = os.getenv("HISTORIAL_ESCRITURA_DIFERIDA", "false").lower() == "true"
+HISTORIAL_DURABILIDAD = os.getenv("HISTORIAL_DURABILIDAD", "lote")  # 'lote' o 'relajada'
+HISTORIAL_LOTE_MAX = int(os.getenv("HISTORIAL_LOTE_MAX", "500"))
+HISTORIAL_INTERVALO_MS = int(os.getenv("HISTORIAL_INTERVALO_MS", "50"))
+HISTORIAL_COLA_MAX = int(os.getenv("HISTORIAL_COLA_MAX", "10000"))
+HISTORIAL_ESPERA_MAX = float(os.getenv("HISTORIAL_ESPERA_MAX", "5"))
+HISTORIAL_RETRY_OCUPADO = int(os.getenv("HISTORIAL_RETRY_OCUPADO", "1"))
+
+if HISTORIAL_DURABILIDAD not in ('lote', 'relajada'):
+    raise ValueError("HISTORIAL_DURABILIDAD debe ser 'lote' o 'relajada'")
+if min(HISTORIAL_LOTE_MAX, HISTORIAL_COLA_MAX, HISTORIAL_RETRY_OCUPADO) < 1:
+    raise ValueError("HISTORIAL_LOTE_MAX, HISTORIAL_COLA_MAX y HISTORIAL_RETRY_OCUPADO deben ser >= 1")
+if HISTORIAL_INTERVALO_MS < 0 or HISTORIAL_ESPERA_MAX <= 0:
+    raise ValueError("HISTORIAL_INTERVALO_MS debe ser >= 0 y HISTORIAL_ESPERA_MAX > 0")
+
+# Máximo de actividades recientes devueltas por /dashboard
+DASHBOARD_HISTORIAL_MAX = int(os.getenv("DASHBOARD_HISTORIAL_MAX", "500"))
+
+# Logging asíncrono: nivel, tamaño de cola, muestreo por logger y límite por mensaje
+LOG_NIVEL = os.getenv("LOG_NIVEL", "INFO")
+LOG_COLA_MAX = int(os.getenv("LOG_COLA_MAX", "10000"))
+LOG_MUESTREO = os.getenv("LOG_MUESTREO", "app_mysql.conexion=0.01,app_mysql.historial=0.1")
+LOG_LIMITE_POR_SEGUNDO = int(os.getenv("LOG_LIMITE_POR_SEGUNDO", "20"))
+
+# ----------------------------
+# LOGGING ASÍNCRONO (COLA + HILO DE FONDO)
+# ----------------------------
+
+class FormateadorJSON(logging.Formatter):
+    """Una línea JSON por registro"""
+
+    def format(self, record):
+        datos = {
+            'fecha': self.formatTime(record),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'hilo': record.threadName,
+        }
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ContadorLogs:
+    """Contadores de registros que no llegan a escribirse"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metricas = {'descartados': 0, 'muestreados': 0, 'limitados': 0}
+
+    def contar(self, metrica):
+        with self._lock:
+            self._metricas[metrica] += 1
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._metricas)
+
+
+contador_logs = ContadorLogs()
+
+
+class ManejadorColaNoBloqueante(logging.handlers.QueueHandler):
+    """Encola el registro sin formatearlo; si la cola está llena lo descarta"""
+
+    def prepare(self, record):
+        # El mensaje se formatea en el hilo de fondo, no en el de la petición
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            contador_logs.contar('descartados')
+
+
+class EscuchaCola(logging.handlers.QueueListener):
+    """QueueListener que espera hueco para el centinela al detenerse"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class FiltroMuestreo(logging.Filter):
+    """Deja pasar solo una fracción de los registros por debajo de WARNING"""
+
+    def __init__(self, tasa):
+        super().__init__()
+        self.tasa = tasa
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or random.random() < self.tasa:
+            return True
+        contador_logs.contar('muestreados')
+        return False
+
+
+class FiltroLimiteFrecuencia(logging.Filter):
+    """Máximo de registros por segundo para cada plantilla de mensaje.
+
+    Solo limita registros por debajo de WARNING de los loggers bajo ``prefijo``:
+    los de otras librerías (p. ej. el access log de werkzeug, que comparte una
+    única plantilla) pasan sin límite. Solo se guardan las cuentas del segundo actual.
+    """
+
+    def __init__(self, limite_por_segundo, prefijo):
+        super().__init__()
+        self.limite = limite_por_segundo
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self._segundo = None
+        self._cuentas = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not record.name.startswith(self.prefijo):
+            return True
+
+        segundo = int(record.created)
+        clave = (record.name, record.msg)
+        with self._lock:
+            if segundo != self._segundo:
+                self._segundo = segundo
+                self._cuentas.clear()
+            cuenta = self._cuentas.get(clave, 0)
+            self._cuentas[clave] = cuenta + 1
+        if cuenta < self.limite:
+            return True
+        contador_logs.contar('limitados')
+        return False
+
+
+def configurar_logging():
+    """El hilo de la petición solo encola; un hilo de fondo escribe en stderr"""
+    cola_logs = queue.Queue(maxsize=LOG_COLA_MAX)
+
+    salida = logging.StreamHandler()
+    salida.setFormatter(FormateadorJSON())
+    escucha = EscuchaCola(cola_logs, salida, respect_handler_level=True)
+
+    manejador = ManejadorColaNoBloqueante(cola_logs)
+    if LOG_LIMITE_POR_SEGUNDO > 0:
+        manejador.addFilter(FiltroLimiteFrecuencia(LOG_LIMITE_POR_SEGUNDO, 'app_mysql'))
+
+    raiz = logging.getLogger()
+    raiz.handlers = [manejador]
+    raiz.setLevel(LOG_NIVEL)
+
+    for regla in filter(None, LOG_MUESTREO.split(',')):
+        nombre, tasa = regla.split('=')
+        logging.getLogger(nombre.strip()).addFilter(FiltroMuestreo(float(tasa)))
+
+    escucha.start()
+    atexit.register(escucha.stop)
+
+
+# Logging único para todo el archivo (con loggers hijos para las rutas calientes)
+configurar_logging()
+logger = logging.getLogger("app_mysql")
+logger_conexion = logging.getLogger("app_mysql.conexion")
+logger_login = logging.getLogger("app_mysql.login")
+logger_historial = logging.getLogger("app_mysql.historial")
+
 # ----------------------------
 # CONEXIÓN Y GESTIÓN MYSQL
 # ----------------------------
@@ -57,12 +244,12 @@ def get_conn():
         connection_params['auth_plugin'] = 'mysql_native_password'
         
         conn = mysql.connector.connect(**connection_params)
-        logger.info("✅ Conexión a MariaDB/MySQL exitosa")
+        logger_conexion.info("✅ Conexión a MariaDB/MySQL exitosa")
         return conn
         
     except Error as e:
-        logger.error(f"❌ Error conectando a MariaDB/MySQL: {e}")
-        logger.error(f"   Parámetros: host={DB_HOST}, port={DB_PORT}, db={DB_NAME}, user={DB_USER}")
+        logger.error("❌ Error conectando a MariaDB/MySQL: %s", e)
+        logger.error("   Parámetros: host=%s, port=%s, db=%s, user=%s", DB_HOST, DB_PORT, DB_NAME, DB_USER)
         raise
 
 # ----------------------------
@@ -72,9 +259,59 @@ def get_conn():
 app = Flask(__name__)
 CORS(app)
 
+class VueloUnico:
+    """Agrupa lecturas concurrentes de la misma clave en una sola consulta.
+
+    La primera petición ejecuta la consulta; las que llegan mientras está en
+    curso esperan y reciben una copia del mismo resultado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_vuelo = {}
+        self._metricas = {'consultas': 0, 'compartidas': 0}
+
+    def ejecutar(self, clave, funcion):
+        with self._lock:
+            llamada = self._en_vuelo.get(clave)
+            lider = llamada is None
+            if lider:
+                llamada = self._en_vuelo[clave] = {
+                    'listo': threading.Event(), 'resultado': None, 'error': None, 'seguidores': 0}
+                self._metricas['consultas'] += 1
+            else:
+                llamada['seguidores'] += 1
+                self._metricas['compartidas'] += 1
+
+        if lider:
+            try:
+                llamada['resultado'] = funcion()
+            except Exception as error:
+                llamada['error'] = error
+            finally:
+                with self._lock:
+                    del self._en_vuelo[clave]
+                llamada['listo'].set()
+        else:
+            llamada['listo'].wait()
+
+        if llamada['error'] is not None:
+            raise llamada['error']
+        # Si el resultado se comparte, cada petición recibe su propia copia
+        if llamada['seguidores']:
+            return copy.deepcopy(llamada['resultado'])
+        return llamada['resultado']
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._metricas, en_vuelo=len(self._en_vuelo))
+
+
 class GestorPerfiles:
     """Clase optimizada para gestión de perfiles con MySQL"""
 
+    lecturas = VueloUnico()
+
     @staticmethod
     def cargar_perfiles():
         """Cargar todos los perfiles desde MySQL"""
@@ -107,7 +344,7 @@ class GestorPerfiles:
             
             return perfiles
         except Error as e:
-            logger.error(f"❌ Error cargando perfiles desde MySQL: {e}")
+            logger.error("❌ Error cargando perfiles desde MySQL: %s", e)
             return []
 
     @staticmethod
@@ -169,7 +406,7 @@ class GestorPerfiles:
             return True
             
         except Error as e:
-            logger.error(f"❌ Error guardando perfil en MySQL: {e}")
+            logger.error("❌ Error guardando perfil en MySQL: %s", e)
             if conn:
                 conn.rollback()
                 conn.close()
@@ -190,16 +427,86 @@ class GestorPerfiles:
             return cursor.rowcount > 0
             
         except Error as e:
-            logger.error(f"❌ Error eliminando perfil: {e}")
+            logger.error("❌ Error eliminando perfil: %s", e)
             if conn:
                 conn.rollback()
                 conn.close()
             return False
 
+    _ultimo_id = 0
+    _lock_id = threading.Lock()
+
     @staticmethod
     def generar_id():
-        """Generar ID único"""
-        return str(int(datetime.now().timestamp()))
+        """Generar ID único (microsegundos, estrictamente creciente)"""
+        with GestorPerfiles._lock_id:
+            nuevo_id = max(int(time.time() * 1_000_000), GestorPerfiles._ultimo_id + 1)
+            GestorPerfiles._ultimo_id = nuevo_id
+        return str(nuevo_id)
+
+    @staticmethod
+    def agregar_habito_historial(usuario_id, actividad):
+        """Insertar una actividad en el historial de MySQL"""
+        try:
+            GestorPerfiles.insertar_historial_lote([(usuario_id, actividad)])
+            return True
+        except Error as e:
+            logger.error("❌ Error guardando historial en MySQL: %s", e)
+            return False
+
+    @staticmethod
+    def insertar_historial_lote(eventos, habitos_completados=()):
+        """Insertar varias actividades (usuario_id, actividad) en una sola transacción.
+
+        En la misma transacción elimina de programados los hábitos completados
+        (usuario_id, habito_id) que no son repetibles (activo = 0).
+        Lanza mysql.connector.Error si falla; la transacción se deshace.
+        """
+        conn = get_conn()
+        try:
+            cursor = conn.cursor()
+
+            # executemany reescribe el INSERT como un único INSERT multi-fila
+            cursor.executemany("""
+                INSERT INTO habitos_historial
+                (id, perfil_id, nombre, hora, estado, fecha)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, [
+                (actividad['id'], usuario_id, actividad['nombre'],
+                 actividad['hora'], actividad['estado'], actividad.get('fecha'))
+                for usuario_id, actividad in eventos
+            ])
+
+            if habitos_completados:
+                marcadores = ', '.join(['(%s, %s)'] * len(habitos_completados))
+                cursor.execute(
+                    f"DELETE FROM habitos_programados WHERE activo = 0 AND (perfil_id, id) IN ({marcadores})",
+                    [valor for par in habitos_completados for valor in par]
+                )
+                logger_historial.debug("   Hábitos no repetibles eliminados de programados: %s", cursor.rowcount)
+
+            conn.commit()
+            cursor.close()
+        except Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def existe_perfil(id_perfil):
+        """Comprobar si existe el perfil sin cargar sus hábitos"""
+        try:
+            conn = get_conn()
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM perfiles WHERE id = %s", (id_perfil,))
+            existe = cursor.fetchone() is not None
+            cursor.close()
+            conn.close()
+            return existe
+        except Error as e:
+            logger.error("❌ Error verificando perfil: %s", e)
+            return False
 
     @staticmethod
     def cifrar_contraseña(contraseña_plana):
@@ -208,7 +515,7 @@ class GestorPerfiles:
             salt = bcrypt.gensalt()
             return bcrypt.hashpw(contraseña_plana.encode('utf-8'), salt).decode('utf-8')
         except Exception as error:
-            logger.error(f"❌ Error cifrando contraseña: {error}")
+            logger.error("❌ Error cifrando contraseña: %s", error)
             return None
 
     @staticmethod
@@ -217,7 +524,7 @@ class GestorPerfiles:
         try:
             return bcrypt.checkpw(contraseña_plana.encode('utf-8'), contraseña_cifrada.encode('utf-8'))
         except Exception as error:
-            logger.error(f"❌ Error verificando contraseña: {error}")
+            logger.error("❌ Error verificando contraseña: %s", error)
             return False
 
     @staticmethod
@@ -253,9 +560,19 @@ class GestorPerfiles:
             return resultado is not None
             
         except Error as e:
-            logger.error(f"❌ Error verificando email duplicado: {e}")
+            logger.error("❌ Error verificando email duplicado: %s", e)
             return False
 
+    @staticmethod
+    def leer_perfil_por_id(id_perfil):
+        """Perfil por ID para endpoints de solo lectura: lecturas concurrentes comparten consulta.
+
+        No usar antes de escribir: el resultado puede venir de una consulta
+        iniciada antes de un commit concurrente.
+        """
+        return GestorPerfiles.lecturas.ejecutar(
+            ('perfil', id_perfil), lambda: GestorPerfiles.buscar_perfil_por_id(id_perfil))
+
     @staticmethod
     def buscar_perfil_por_id(id_perfil):
         """Encontrar perfil por ID en MySQL"""
@@ -286,9 +603,76 @@ class GestorPerfiles:
             return perfil
             
         except Error as e:
-            logger.error(f"❌ Error buscando perfil por ID: {e}")
+            logger.error("❌ Error buscando perfil por ID: %s", e)
+            return None
+
+    @staticmethod
+    def obtener_dashboard(id_perfil, limite_historial=DASHBOARD_HISTORIAL_MAX):
+        """Perfil, hábitos, historial reciente y resumen en una sola consulta"""
+        return GestorPerfiles.lecturas.ejecutar(
+            ('dashboard', id_perfil, limite_historial),
+            lambda: GestorPerfiles._consultar_dashboard(id_perfil, limite_historial))
+
+    @staticmethod
+    def _consultar_dashboard(id_perfil, limite_historial):
+        try:
+            conn = get_conn()
+            cursor = conn.cursor(dictionary=True)
+
+            # Un único round trip: cada fila indica en 'tipo' a qué parte pertenece
+            cursor.execute("""
+                SELECT 'perfil' AS tipo, id, nombre, email, NULL AS hora, NULL AS categoria,
+                       NULL AS activo, NULL AS estado, fecha_creacion AS fecha,
+                       NULL AS total, NULL AS completados
+                FROM perfiles WHERE id = %s
+                UNION ALL
+                SELECT 'habito', id, nombre, NULL, hora, categoria, activo, NULL, NULL, NULL, NULL
+                FROM habitos_programados WHERE perfil_id = %s
+                UNION ALL
+                (SELECT 'historial', id, nombre, NULL, hora, NULL, NULL, estado, fecha, NULL, NULL
+                 FROM habitos_historial WHERE perfil_id = %s
+                 ORDER BY fecha DESC, id DESC LIMIT %s)
+                UNION ALL
+                SELECT 'resumen', NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+                       COUNT(*), COALESCE(SUM(estado = 'completado'), 0)
+                FROM habitos_historial WHERE perfil_id = %s
+            """, (id_perfil, id_perfil, id_perfil, limite_historial, id_perfil))
+            filas = cursor.fetchall()
+
+            cursor.close()
+            conn.close()
+        except Error as e:
+            logger.error("❌ Error obteniendo dashboard: %s", e)
+            return None
+
+        perfil, habitos, historial, resumen = None, [], [], {}
+        for fila in filas:
+            tipo = fila['tipo']
+            if tipo == 'perfil':
+                perfil = {'id': fila['id'], 'nombre': fila['nombre'],
+                          'email': fila['email'], 'fecha_creacion': fila['fecha']}
+            elif tipo == 'habito':
+                habitos.append({'id': fila['id'], 'perfil_id': id_perfil, 'nombre': fila['nombre'],
+                                'hora': fila['hora'], 'categoria': fila['categoria'],
+                                'activo': fila['activo']})
+            elif tipo == 'historial':
+                historial.append({'id': fila['id'], 'perfil_id': id_perfil, 'nombre': fila['nombre'],
+                                  'hora': fila['hora'], 'estado': fila['estado'],
+                                  'fecha': fila['fecha']})
+            else:
+                resumen = {'total_historial': int(fila['total']),
+                           'completados': int(fila['completados'])}
+
+        if perfil is None:
             return None
 
+        # El historial se ordenó por fecha descendente solo para aplicar el límite
+        historial.reverse()
+        resumen['no_completados'] = resumen['total_historial'] - resumen['completados']
+        resumen['habitos_programados'] = len(habitos)
+
+        return {'perfil': perfil, 'habitos': habitos, 'historial': historial, 'resumen': resumen}
+
     @staticmethod
     def crear_perfil_seguro(perfil):
         """Crear copia segura del perfil sin contraseña"""
@@ -307,11 +691,368 @@ def respuesta_error(mensaje, codigo=400):
 def respuesta_exitosa(datos, codigo=200):
     return jsonify(datos), codigo
 
+# ----------------------------
+# CONTROL DE ADMISIÓN (ENDPOINTS CON BCRYPT)
+# ----------------------------
+
+class AlmacenContadoresLocal:
+    """Almacén de token buckets en memoria del proceso.
+
+    Sustituto local de un almacén compartido entre workers (p. ej. Redis):
+    cualquier otro almacén solo necesita implementar ``consumir``.
+    Los buckets se guardan en orden LRU junto con el instante en que
+    volverían a estar llenos, para poder desalojarlos sin recorrerlos todos.
+    """
+
+    def __init__(self, max_claves):
+        self.max_claves = max_claves
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self.desalojados_activos = 0
+
+    def consumir(self, clave, capacidad, recarga):
+        """Consumir un token. Devuelve (permitido, segundos_hasta_siguiente_token)"""
+        ahora = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(clave)
+            if bucket is None:
+                tokens = capacidad
+            else:
+                tokens, ultimo, _ = bucket
+                tokens = min(capacidad, tokens + (ahora - ultimo) * recarga)
+
+            if tokens >= 1:
+                tokens -= 1
+                permitido, espera = True, 0
+            else:
+                permitido, espera = False, (1 - tokens) / recarga
+
+            lleno_en = ahora + (capacidad - tokens) / recarga
+            self._buckets[clave] = (tokens, ahora, lleno_en)
+            self._buckets.move_to_end(clave)
+
+            if len(self._buckets) > self.max_claves:
+                self._desalojar(ahora)
+
+        return permitido, espera
+
+    def _desalojar(self, ahora):
+        """Eliminar los buckets menos usados recientemente hasta volver al máximo"""
+        while len(self._buckets) > self.max_claves:
+            _, (_, _, lleno_en) = self._buckets.popitem(last=False)
+            # Un bucket aún no lleno se pierde con tokens de más: queda contado
+            if lleno_en > ahora:
+                self.desalojados_activos += 1
+
+
+class ControlAdmision:
+    """Token buckets por cliente y por cuenta + límite global de hashes concurrentes"""
+
+    def __init__(self, almacen, max_concurrentes):
+        self.almacen = almacen
+        self._semaforo = threading.BoundedSemaphore(max_concurrentes)
+        self._lock = threading.Lock()
+        self._metricas = {
+            'admitidas': 0,
+            'rechazadas_cliente': 0,
+            'rechazadas_cuenta': 0,
+            'rechazadas_saturacion': 0,
+            'en_curso': 0,
+        }
+
+    def _contar(self, metrica, delta=1):
+        with self._lock:
+            self._metricas[metrica] += delta
+
+    def registrar_rechazo(self, metrica):
+        self._contar(metrica)
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._metricas, desalojados_activos=self.almacen.desalojados_activos)
+
+    def verificar_limites(self, cliente, cuenta):
+        """Devuelve None si se admite, o (metrica, segundos de espera) si se rechaza"""
+        permitido, espera = self.almacen.consumir(
+            f"cliente:{cliente}", ADMISION_CLIENTE_CAPACIDAD, ADMISION_CLIENTE_RECARGA)
+        if not permitido:
+            return 'rechazadas_cliente', espera
+
+        if cuenta:
+            permitido, espera = self.almacen.consumir(
+                f"cuenta:{cuenta.lower()}", ADMISION_CUENTA_CAPACIDAD, ADMISION_CUENTA_RECARGA)
+            if not permitido:
+                return 'rechazadas_cuenta', espera
+
+        return None
+
+    def adquirir(self):
+        """Reservar un hueco de hash sin bloquear"""
+        if not self._semaforo.acquire(blocking=False):
+            return False
+        self._contar('en_curso')
+        return True
+
+    def registrar_admision(self):
+        self._contar('admitidas')
+
+    def liberar(self):
+        self._contar('en_curso', -1)
+        self._semaforo.release()
+
+
+control_admision = ControlAdmision(AlmacenContadoresLocal(ADMISION_MAX_CLAVES), ADMISION_MAX_CONCURRENTES)
+
+
+def respuesta_rechazo(mensaje, codigo, segundos_espera):
+    respuesta, codigo = respuesta_error(mensaje, codigo)
+    respuesta.headers['Retry-After'] = str(max(1, math.ceil(segundos_espera)))
+    return respuesta, codigo
+
+
+def controlar_admision(obtener_cuenta, aplica=None):
+    """Decorador: rechaza con 429/503 antes de tocar la DB o ejecutar bcrypt"""
+    def decorador(endpoint):
+        @wraps(endpoint)
+        def envoltorio(*args, **kwargs):
+            if aplica is not None and not aplica():
+                return endpoint(*args, **kwargs)
+
+            # Primero el hueco de hash: un 503 por saturación no gasta tokens de los buckets
+            if not control_admision.adquirir():
+                control_admision.registrar_rechazo('rechazadas_saturacion')
+                return respuesta_rechazo('Servidor ocupado, inténtelo más tarde', 503,
+                                         ADMISION_RETRY_SATURADO)
+            try:
+                rechazo = control_admision.verificar_limites(request.remote_addr, obtener_cuenta())
+                if rechazo:
+                    metrica, espera = rechazo
+                    control_admision.registrar_rechazo(metrica)
+                    return respuesta_rechazo('Demasiados intentos, inténtelo más tarde', 429, espera)
+
+                control_admision.registrar_admision()
+                return endpoint(*args, **kwargs)
+            finally:
+                control_admision.liberar()
+        return envoltorio
+    return decorador
+
+# ----------------------------
+# ESCRITURA DIFERIDA DEL HISTORIAL (GROUP COMMIT)
+# ----------------------------
+
+class EventoHistorial:
+    """Actividad pendiente de escribir y su resultado"""
+
+    __slots__ = ('usuario_id', 'actividad', 'habito_completado', 'listo', 'resultado', 'estado')
+
+    def __init__(self, usuario_id, actividad, habito_completado=None):
+        self.usuario_id = usuario_id
+        self.actividad = actividad
+        self.habito_completado = habito_completado
+        self.listo = threading.Event()
+        # 'guardado', 'perfil_inexistente' o 'error'
+        self.resultado = None
+        # 'pendiente' -> 'reclamado' (en un lote) o 'cancelado' (la petición dejó de esperar)
+        self.estado = 'pendiente'
+
+
+def es_error_conexion(error):
+    """Errores del cliente MySQL (2000-2999): no se pudo conectar o se perdió la conexión"""
+    return error.errno is not None and 2000 <= error.errno < 3000
+
+
+# ER_NO_REFERENCED_ROW_2: la clave foránea perfil_id no existe
+ERROR_PERFIL_INEXISTENTE = 1452
+
+
+class EscritorHistorial:
+    """Cola acotada en memoria que vuelca el historial en INSERTs multi-fila.
+
+    Un hilo de fondo agrupa eventos hasta ``lote_max`` o ``intervalo_ms`` y
+    los confirma con un único commit, junto con el borrado de los hábitos no
+    repetibles completados. Con durabilidad 'lote' la petición espera al
+    commit de su lote; con 'relajada' se confirma al encolar. No se comprueba
+    el perfil antes de encolar: la clave foránea rechaza la fila en el lote.
+    """
+
+    def __init__(self, lote_max, intervalo_ms, cola_max, durabilidad):
+        self.lote_max = lote_max
+        self.intervalo = intervalo_ms / 1000
+        self.durabilidad = durabilidad
+        self._cola = queue.Queue(maxsize=cola_max)
+        self._hilo = None
+        # Reentrante: _contar() se llama también con el lock ya tomado
+        self._lock = threading.RLock()
+        self._detenido = False
+        self._metricas = {'eventos': 0, 'lotes': 0, 'errores': 0, 'rechazados': 0, 'cancelados': 0}
+
+    def encolar(self, usuario_id, actividad, habito_completado=None):
+        """Encolar una actividad y devolver 'guardado', 'perfil_inexistente' o 'error'.
+
+        Lanza queue.Full si la cola está llena o si el lote no empezó a
+        escribirse a tiempo; en ese caso el evento se cancela y no se escribe.
+        """
+        evento = EventoHistorial(usuario_id, actividad, habito_completado)
+        with self._lock:
+            # Comprobar y encolar bajo el mismo lock: ningún evento entra tras el centinela
+            detenido = self._detenido
+            if not detenido:
+                self._iniciar()
+                try:
+                    self._cola.put_nowait(evento)
+                except queue.Full:
+                    self._contar('rechazados')
+                    raise
+
+        if detenido:
+            self._volcar([evento])
+            return evento.resultado
+
+        if self.durabilidad == 'relajada':
+            return 'guardado'
+        if not evento.listo.wait(self.intervalo + HISTORIAL_ESPERA_MAX):
+            with self._lock:
+                if evento.estado == 'pendiente':
+                    evento.estado = 'cancelado'
+                    self._contar('cancelados')
+                    raise queue.Full
+            # Ya está en un lote en curso: su resultado llegará con el commit
+            evento.listo.wait()
+        return evento.resultado
+
+    def metricas(self):
+        with self._lock:
+            return dict(self._metricas, en_cola=self._cola.qsize())
+
+    def detener(self):
+        """Vaciar la cola pendiente y parar el hilo de fondo"""
+        with self._lock:
+            if self._detenido:
+                return
+            self._detenido = True
+            hilo = self._hilo
+        if hilo:
+            self._cola.put(None)
+            hilo.join()
+
+    def _contar(self, metrica, delta=1):
+        with self._lock:
+            self._metricas[metrica] += delta
+
+    def _iniciar(self):
+        """Arrancar el hilo de fondo si hace falta (se llama con el lock tomado)"""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle, name='escritor-historial', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        terminar = False
+        while not terminar:
+            lote = []
+            evento = self._cola.get()
+            limite = time.monotonic() + self.intervalo
+
+            # Acumular hasta completar el lote o agotar el intervalo
+            while evento is not None:
+                lote.append(evento)
+                if len(lote) >= self.lote_max:
+                    break
+                restante = limite - time.monotonic()
+                try:
+                    evento = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                terminar = True
+
+            if lote:
+                self._volcar(lote)
+
+    def _volcar(self, lote):
+        with self._lock:
+            lote = [evento for evento in lote if evento.estado == 'pendiente']
+            for evento in lote:
+                evento.estado = 'reclamado'
+        if not lote:
+            return
+
+        try:
+            self._escribir(lote)
+        except Exception as e:
+            # Un evento reclamado siempre recibe resultado: su petición espera sin límite
+            logger.exception("❌ Error inesperado volcando el historial: %s", e)
+            self._marcar([evento for evento in lote if not evento.listo.is_set()], 'error')
+
+    def _escribir(self, lote):
+        try:
+            self._insertar(lote)
+            self._marcar(lote, 'guardado')
+            return
+        except Error as e:
+            logger.error("❌ Falló el lote de historial (%s eventos): %s", len(lote), e)
+            if es_error_conexion(e):
+                self._marcar(lote, 'error')
+                return
+
+        # Aislar la fila problemática (p. ej. perfil eliminado) sin perder el resto
+        for posicion, evento in enumerate(lote):
+            try:
+                self._insertar([evento])
+                self._marcar([evento], 'guardado')
+            except Error as e:
+                logger.error("❌ Error guardando actividad %s del historial: %s", evento.actividad['id'], e)
+                if es_error_conexion(e):
+                    self._marcar(lote[posicion:], 'error')
+                    return
+                self._marcar([evento], 'perfil_inexistente' if e.errno == ERROR_PERFIL_INEXISTENTE else 'error')
+
+    @staticmethod
+    def _insertar(eventos):
+        GestorPerfiles.insertar_historial_lote(
+            [(e.usuario_id, e.actividad) for e in eventos],
+            [(e.usuario_id, e.habito_completado) for e in eventos if e.habito_completado])
+
+    def _marcar(self, eventos, resultado):
+        if not eventos:
+            return
+        with self._lock:
+            if resultado == 'guardado':
+                self._metricas['eventos'] += len(eventos)
+                self._metricas['lotes'] += 1
+            else:
+                self._metricas['errores'] += len(eventos)
+        for evento in eventos:
+            evento.resultado = resultado
+            evento.listo.set()
+
+
+escritor_historial = None
+if HISTORIAL_ESCRITURA_DIFERIDA:
+    escritor_historial = EscritorHistorial(
+        HISTORIAL_LOTE_MAX, HISTORIAL_INTERVALO_MS, HISTORIAL_COLA_MAX, HISTORIAL_DURABILIDAD)
+    atexit.register(escritor_historial.detener)
+
+    # docker stop / systemd envían SIGTERM, cuya acción por defecto no ejecuta atexit.
+    # El manejador solo provoca la salida: el volcado lo hace atexit fuera del
+    # manejador, cuando los bloques ``with self._lock`` interrumpidos ya se deshicieron.
+    if threading.current_thread() is threading.main_thread():
+        senal_previa = signal.getsignal(signal.SIGTERM)
+
+        def salir_por_senal(signum, frame):
+            if callable(senal_previa):
+                senal_previa(signum, frame)
+            elif senal_previa == signal.SIG_DFL:
+                raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, salir_por_senal)
+
 # ----------------------------
 # ENDPOINTS ACTUALIZADOS (SOLO FORM DATA)
 # ----------------------------
 
 @app.route('/perfiles', methods=['POST'])
+@controlar_admision(lambda: request.form.get('email'))
 def crear_perfil():
     """Endpoint para crear nuevo perfil - FORM DATA"""
     try:
@@ -344,13 +1085,13 @@ def crear_perfil():
         }
 
         if GestorPerfiles.guardar_perfil(nuevo_perfil):
-            logger.info(f"✅ Perfil creado: {nuevo_perfil['email']}")
+            logger.info("✅ Perfil creado: %s", nuevo_perfil['email'])
             return respuesta_exitosa(GestorPerfiles.crear_perfil_seguro(nuevo_perfil), 201)
         else:
             return respuesta_error('Error guardando perfil', 500)
 
     except Exception as error:
-        logger.error(f"❌ Error inesperado creando perfil: {error}")
+        logger.error("❌ Error inesperado creando perfil: %s", error)
         return respuesta_error('Error interno del servidor', 500)
 
 @app.route('/perfiles', methods=['GET'])
@@ -361,24 +1102,26 @@ def listar_todos_perfiles():
         perfiles_seguros = [GestorPerfiles.crear_perfil_seguro(perfil) for perfil in todos_perfiles]
         return respuesta_exitosa(perfiles_seguros)
     except Exception as error:
-        logger.error(f"❌ Error listando perfiles: {error}")
+        logger.error("❌ Error listando perfiles: %s", error)
         return respuesta_error('Error obteniendo perfiles', 500)
 
 @app.route('/perfiles/<string:id_perfil>', methods=['GET'])
 def obtener_perfil_especifico(id_perfil):
     """Endpoint para obtener un perfil específico"""
     try:
-        perfil_objetivo = GestorPerfiles.buscar_perfil_por_id(id_perfil)
+        perfil_objetivo = GestorPerfiles.leer_perfil_por_id(id_perfil)
 
         if not perfil_objetivo:
             return respuesta_error('Perfil no encontrado', 404)
 
         return respuesta_exitosa(GestorPerfiles.crear_perfil_seguro(perfil_objetivo))
     except Exception as error:
-        logger.error(f"❌ Error obteniendo perfil {id_perfil}: {error}")
+        logger.error("❌ Error obteniendo perfil %s: %s", id_perfil, error)
         return respuesta_error('Error obteniendo perfil', 500)
 
 @app.route('/perfiles/<string:id_perfil>', methods=['PUT'])
+@controlar_admision(lambda: request.view_args.get('id_perfil'),
+                    aplica=lambda: bool(request.form.get('contraseña')))
 def actualizar_perfil_existente(id_perfil):
     """Endpoint para actualizar un perfil existente - FORM DATA"""
     try:
@@ -408,13 +1151,13 @@ def actualizar_perfil_existente(id_perfil):
                 perfil_actual['contraseña'] = contraseña_cifrada
 
         if GestorPerfiles.guardar_perfil(perfil_actual):
-            logger.info(f"✅ Perfil actualizado: {id_perfil}")
+            logger.info("✅ Perfil actualizado: %s", id_perfil)
             return respuesta_exitosa(GestorPerfiles.crear_perfil_seguro(perfil_actual))
         else:
             return respuesta_error('Error guardando cambios', 500)
 
     except Exception as error:
-        logger.error(f"❌ Error actualizando perfil {id_perfil}: {error}")
+        logger.error("❌ Error actualizando perfil %s: %s", id_perfil, error)
         return respuesta_error('Error actualizando perfil', 500)
 
 
@@ -426,16 +1169,17 @@ def eliminar_perfil(id_perfil):
     """Endpoint para eliminar un perfil"""
     try:
         if GestorPerfiles.eliminar_perfil(id_perfil):
-            logger.info(f"✅ Perfil eliminado: {id_perfil}")
+            logger.info("✅ Perfil eliminado: %s", id_perfil)
             return respuesta_exitosa({'mensaje': 'Perfil eliminado correctamente'})
         else:
             return respuesta_error('Perfil no encontrado', 404)
 
     except Exception as error:
-        logger.error(f"❌ Error eliminando perfil {id_perfil}: {error}")
+        logger.error("❌ Error eliminando perfil %s: %s", id_perfil, error)
         return respuesta_error('Error eliminando perfil', 500)
 
 @app.route('/perfiles/login', methods=['POST'])
+@controlar_admision(lambda: request.form.get('email'))
 def login_usuario():
     """Endpoint para login de usuario - FORM DATA"""
     try:
@@ -457,7 +1201,7 @@ def login_usuario():
             cursor.close()
             conn.close()
         except Error as e:
-            logger.error(f"❌ Error buscando perfil para login: {e}")
+            logger.error("❌ Error buscando perfil para login: %s", e)
             return respuesta_error('Error en el servidor', 500)
 
         if not perfil:
@@ -470,11 +1214,11 @@ def login_usuario():
         # Cargar hábitos del usuario
         perfil_completo = GestorPerfiles.buscar_perfil_por_id(perfil['id'])
 
-        logger.info(f"✅ Login exitoso: {perfil['email']}")
+        logger_login.info("✅ Login exitoso: %s", perfil['email'])
         return respuesta_exitosa(GestorPerfiles.crear_perfil_seguro(perfil_completo))
 
     except Exception as error:
-        logger.error(f"❌ Error en login: {error}")
+        logger.error("❌ Error en login: %s", error)
         return respuesta_error('Error en el servidor', 500)
 
 @app.route('/admin/accesos', methods=['POST'])
@@ -498,7 +1242,7 @@ def acceso_administrador():
             return respuesta_error('Credenciales de administrador incorrectas', 401)
             
     except Exception as error:
-        logger.error(f"❌ Error en acceso de administrador: {error}")
+        logger.error("❌ Error en acceso de administrador: %s", error)
         return respuesta_error('Error en el servidor', 500)
 
 # ✅ ENDPOINTS PARA HÁBITOS E HISTORIAL - FORM DATA
@@ -506,13 +1250,13 @@ def acceso_administrador():
 def obtener_habitos_usuario(usuario_id):
     """Obtener hábitos de un usuario específico"""
     try:
-        perfil = GestorPerfiles.buscar_perfil_por_id(usuario_id)
+        perfil = GestorPerfiles.leer_perfil_por_id(usuario_id)
         if not perfil:
             return respuesta_error('Usuario no encontrado', 404)
         
         return respuesta_exitosa({'habitos': perfil.get('habitos_programados', [])})
     except Exception as error:
-        logger.error(f"❌ Error obteniendo hábitos: {error}")
+        logger.error("❌ Error obteniendo hábitos: %s", error)
         return respuesta_error('Error obteniendo hábitos', 500)
 
 @app.route('/habitos/guardar', methods=['POST'])
@@ -548,7 +1292,7 @@ def guardar_habito():
             return respuesta_error('Error guardando hábito', 500)
             
     except Exception as error:
-        logger.error(f"❌ Error guardando hábito: {error}")
+        logger.error("❌ Error guardando hábito: %s", error)
         return respuesta_error('Error guardando hábito', 500)
 
 @app.route('/habitos/eliminar', methods=['DELETE'])
@@ -582,24 +1326,37 @@ def eliminar_habito():
                 return respuesta_error('Hábito no encontrado', 404)
                 
         except Error as e:
-            logger.error(f"❌ Error eliminando hábito: {e}")
+            logger.error("❌ Error eliminando hábito: %s", e)
             return respuesta_error('Error eliminando hábito', 500)
             
     except Exception as error:
-        logger.error(f"❌ Error eliminando hábito: {error}")
+        logger.error("❌ Error eliminando hábito: %s", error)
         return respuesta_error('Error eliminando hábito', 500)
 
+@app.route('/dashboard/<string:usuario_id>', methods=['GET'])
+def obtener_dashboard_usuario(usuario_id):
+    """Perfil, hábitos, historial reciente y resumen para la página principal"""
+    try:
+        dashboard = GestorPerfiles.obtener_dashboard(usuario_id)
+        if not dashboard:
+            return respuesta_error('Usuario no encontrado', 404)
+
+        return respuesta_exitosa(dashboard)
+    except Exception as error:
+        logger.error("❌ Error obteniendo dashboard: %s", error)
+        return respuesta_error('Error obteniendo dashboard', 500)
+
 @app.route('/historial/obtener/<string:usuario_id>', methods=['GET'])
 def obtener_historial_usuario(usuario_id):
     """Obtener historial de un usuario específico"""
     try:
-        perfil = GestorPerfiles.buscar_perfil_por_id(usuario_id)
+        perfil = GestorPerfiles.leer_perfil_por_id(usuario_id)
         if not perfil:
             return respuesta_error('Usuario no encontrado', 404)
         
         return respuesta_exitosa({'historial': perfil.get('historial_habitos', [])})
     except Exception as error:
-        logger.error(f"❌ Error obteniendo historial: {error}")
+        logger.error("❌ Error obteniendo historial: %s", error)
         return respuesta_error('Error obteniendo historial', 500)
 
 @app.route('/historial/guardar', methods=['POST'])
@@ -618,10 +1375,6 @@ def guardar_historial():
         if not all([usuario_id, habito_id, nombre, hora, estado]):
             return respuesta_error('Todos los campos son requeridos')
 
-        perfil = GestorPerfiles.buscar_perfil_por_id(usuario_id)
-        if not perfil:
-            return respuesta_error('Usuario no encontrado', 404)
-
         nueva_actividad = {
             'id': GestorPerfiles.generar_id(),
             'nombre': nombre,
@@ -630,13 +1383,31 @@ def guardar_historial():
             'fecha': datetime.now().isoformat()
         }
 
+        # ✅ ESCRITURA DIFERIDA: EL ESCRITOR GUARDA Y ELIMINA EL HÁBITO NO REPETIBLE EN SU LOTE
+        if escritor_historial:
+            try:
+                resultado = escritor_historial.encolar(
+                    usuario_id, nueva_actividad, habito_id if estado == 'completado' else None)
+            except queue.Full:
+                return respuesta_rechazo('Servidor ocupado, inténtelo más tarde', 503,
+                                         HISTORIAL_RETRY_OCUPADO)
+
+            if resultado == 'guardado':
+                return respuesta_exitosa(nueva_actividad, 201)
+            if resultado == 'perfil_inexistente':
+                return respuesta_error('Usuario no encontrado', 404)
+            return respuesta_error('Error guardando en historial', 500)
+
+        if not GestorPerfiles.existe_perfil(usuario_id):
+            return respuesta_error('Usuario no encontrado', 404)
+
         # ✅ ELIMINAR EL HÁBITO DE HABITOS_PROGRAMADOS CUANDO SE COMPLETA (SOLO SI NO ES REPETIBLE)
         if estado == 'completado':
-            logger.info(f"🔍 Verificando eliminación de hábito completado: {nombre} (ID: {habito_id}) para usuario {usuario_id}")
+            logger_historial.debug("🔍 Verificando eliminación de hábito completado: %s (ID: %s) para usuario %s", nombre, habito_id, usuario_id)
 
             try:
                 conn = get_conn()
-                cursor = conn.cursor()
+                cursor = conn.cursor(dictionary=True)
 
                 # Cargar el hábito específico desde la base de datos
                 cursor.execute(
@@ -645,21 +1416,22 @@ def guardar_historial():
                 )
                 habito_db = cursor.fetchone()
 
-                logger.info(f"   Hábito encontrado en DB: {habito_db}")
+                logger_historial.debug("   Hábito encontrado en DB: %s", habito_db)
 
                 if habito_db:
                     activo = habito_db['activo']
-                    logger.info(f"   Campo 'activo': {activo}")
+                    logger_historial.debug("   Campo 'activo': %s", activo)
 
                     # Solo eliminar si el hábito NO es repetible (activo = 0)
                     if activo == 0:
-                        # Verificar que existe antes de eliminar
-                        cursor.execute(
-                            "SELECT COUNT(*) as count FROM habitos_programados WHERE perfil_id = %s AND id = %s",
-                            (usuario_id, habito_id)
-                        )
-                        count = cursor.fetchone()['count']
-                        logger.info(f"   Registros encontrados antes de eliminar: {count}")
+                        # Verificar que existe antes de eliminar (solo para la traza de depuración)
+                        if logger_historial.isEnabledFor(logging.DEBUG):
+                            cursor.execute(
+                                "SELECT COUNT(*) as count FROM habitos_programados WHERE perfil_id = %s AND id = %s",
+                                (usuario_id, habito_id)
+                            )
+                            count = cursor.fetchone()['count']
+                            logger_historial.debug("   Registros encontrados antes de eliminar: %s", count)
 
                         cursor.execute(
                             "DELETE FROM habitos_programados WHERE perfil_id = %s AND id = %s",
@@ -667,28 +1439,28 @@ def guardar_historial():
                         )
 
                         deleted_count = cursor.rowcount
-                        logger.info(f"✅ Hábito '{nombre}' (ID: {habito_id}) eliminado de programados para usuario {usuario_id}. Registros eliminados: {deleted_count}")
+                        logger_historial.info("✅ Hábito '%s' (ID: %s) eliminado de programados para usuario %s. Registros eliminados: %s", nombre, habito_id, usuario_id, deleted_count)
 
                         conn.commit()
                     else:
-                        logger.info(f"ℹ️ Hábito '{nombre}' (ID: {habito_id}) es repetible (activo={activo}), se mantiene en programados")
+                        logger_historial.info("ℹ️ Hábito '%s' (ID: %s) es repetible (activo=%s), se mantiene en programados", nombre, habito_id, activo)
                 else:
-                    logger.info(f"ℹ️ Hábito '{nombre}' (ID: {habito_id}) no encontrado en programados")
+                    logger_historial.info("ℹ️ Hábito '%s' (ID: %s) no encontrado en programados", nombre, habito_id)
 
                 cursor.close()
                 conn.close()
             except Error as e:
-                logger.error(f"❌ Error verificando/elimando hábito programado: {e}")
+                logger_historial.error("❌ Error verificando/elimando hábito programado: %s", e)
                 if conn:
                     conn.close()
 
         if GestorPerfiles.agregar_habito_historial(usuario_id, nueva_actividad):
             return respuesta_exitosa(nueva_actividad, 201)
         else:
-                return respuesta_error('Error guardando en historial', 500)
+            return respuesta_error('Error guardando en historial', 500)
 
     except Exception as error:
-        logger.error(f"❌ Error guardando historial: {error}")
+        logger.error("❌ Error guardando historial: %s", error)
         return respuesta_error('Error guardando historial', 500)
 
 @app.route('/health', methods=['GET'])
@@ -709,6 +1481,16 @@ def verificar_estado():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/metricas', methods=['GET'])
+def obtener_metricas():
+    """Endpoint con métricas internas del servicio"""
+    return respuesta_exitosa({
+        'admision': control_admision.metricas(),
+        'lecturas': GestorPerfiles.lecturas.metricas(),
+        'logs': contador_logs.metricas(),
+        'historial': escritor_historial.metricas() if escritor_historial else None
+    })
+
 @app.route('/frontend/Inicio_Sesion/<path:filename>')
 def serve_static_files(filename):
     return send_from_directory('../frontend/Inicio_Sesion', filename)
@@ -2,6 +2,7 @@
 const API_BASE_URL = 'http://localhost:5000';
 let usuarioActual = null;
 let perfilUsuario = null;
+let resumenUsuario = null;
 
 const elements = {
   habitList: document.getElementById("habitList"),
@@ -50,103 +51,55 @@ function verificarSesion() {
   }
 
   usuarioActual = { id: usuarioId };
-  cargarDatosUsuario();
-}
-
-async function cargarDatosUsuario() {
-  try {
-    const respuesta = await fetch(`${API_BASE_URL}/perfiles/${usuarioActual.id}`);
-    if (respuesta.ok) {
-      const usuario = await respuesta.json();
-      elements.userName.textContent = usuario.nombre || 'Usuario';
-    }
-  } catch (error) {
-    console.error('Error cargando datos usuario:', error);
-  }
 }
 
+// ✅ Cargar perfil, hábitos e historial en una sola petición
 async function cargarPerfilUsuario() {
   if (!usuarioActual) return;
-  
-  try {
-    const respuesta = await fetch(`${API_BASE_URL}/perfiles/${usuarioActual.id}`);
-    if (respuesta.ok) {
-      perfilUsuario = await respuesta.json();
-      
-      if (perfilUsuario) {
-        mostrarInformacionPerfil();
-        await cargarHabitosProgramados();
-        await cargarHistorialDesdeMySQL();
-      }
-    }
-  } catch (error) {
-    console.error('Error cargando perfil:', error);
-  }
-}
-
-// ✅ Cargar hábitos desde MySQL
-async function cargarHabitosProgramados() {
-  if (!usuarioActual) return;
 
   try {
-    console.log('Cargando hábitos desde:', `${API_BASE_URL}/habitos/obtener/${usuarioActual.id}`);
-    const respuesta = await fetch(`${API_BASE_URL}/habitos/obtener/${usuarioActual.id}`);
-    console.log('Respuesta de hábitos:', respuesta.status, respuesta.statusText);
+    const respuesta = await fetch(`${API_BASE_URL}/dashboard/${usuarioActual.id}`);
 
     if (respuesta.ok) {
       const datos = await respuesta.json();
-      console.log('Datos de hábitos recibidos:', datos);
-
-      // Mapear los campos del backend al formato esperado por el frontend
-      habits = (datos.habitos || []).map(habito => ({
-        id: habito.id.toString(),
-        name: habito.nombre,
-        time: habito.hora,
-        repeat: habito.activo === 1 || habito.activo === true,
-        activo: habito.activo === 1 || habito.activo === true // ✅ Agregar campo 'activo'
-      }));
-
-      console.log('Hábitos mapeados:', habits);
+      perfilUsuario = datos.perfil;
+      resumenUsuario = datos.resumen;
+      elements.userName.textContent = perfilUsuario.nombre || 'Usuario';
+
+      habits = mapearHabitos(datos.habitos || []);
+      activities = mapearHistorial(datos.historial || []);
+
+      mostrarInformacionPerfil();
       renderHabits();
+      renderActivities();
     } else {
-      console.error('Error en respuesta de hábitos:', respuesta.status, await respuesta.text());
+      console.error('Error en respuesta del dashboard:', respuesta.status, await respuesta.text());
     }
   } catch (error) {
-    console.error('Error cargando hábitos:', error);
+    console.error('Error cargando perfil:', error);
   }
 }
 
-// ✅ Cargar historial desde MySQL
-async function cargarHistorialDesdeMySQL() {
-  if (!usuarioActual) return;
-
-  try {
-    console.log('Cargando historial desde:', `${API_BASE_URL}/historial/obtener/${usuarioActual.id}`);
-    const respuesta = await fetch(`${API_BASE_URL}/historial/obtener/${usuarioActual.id}`);
-    console.log('Respuesta de historial:', respuesta.status, respuesta.statusText);
+// Mapear los campos del backend al formato esperado por el frontend
+function mapearHabitos(lista) {
+  return lista.map(habito => ({
+    id: habito.id.toString(),
+    name: habito.nombre,
+    time: habito.hora,
+    repeat: habito.activo === 1 || habito.activo === true,
+    activo: habito.activo === 1 || habito.activo === true // ✅ Agregar campo 'activo'
+  }));
+}
 
-    if (respuesta.ok) {
-      const datos = await respuesta.json();
-      console.log('Datos de historial recibidos:', datos);
-
-      // Mapear los campos del backend al formato esperado por el frontend
-      activities = (datos.historial || []).map(actividad => ({
-        habitId: actividad.id.toString(),
-        name: actividad.nombre,
-        time: actividad.hora,
-        status: actividad.estado === 'completado' ? '✅ Cumplido' : '❌ No cumplido',
-        statusClass: actividad.estado === 'completado' ? 'done' : 'fail',
-        date: new Date(actividad.fecha).toLocaleDateString('es-ES')
-      }));
-
-      console.log('Historial mapeado:', activities);
-      renderActivities();
-    } else {
-      console.error('Error en respuesta de historial:', respuesta.status, await respuesta.text());
-    }
-  } catch (error) {
-    console.error('Error cargando historial:', error);
-  }
+function mapearHistorial(lista) {
+  return lista.map(actividad => ({
+    habitId: actividad.id.toString(),
+    name: actividad.nombre,
+    time: actividad.hora,
+    status: actividad.estado === 'completado' ? '✅ Cumplido' : '❌ No cumplido',
+    statusClass: actividad.estado === 'completado' ? 'done' : 'fail',
+    date: new Date(actividad.fecha).toLocaleDateString('es-ES')
+  }));
 }
 
 function mostrarInformacionPerfil() {
@@ -157,7 +110,7 @@ function mostrarInformacionPerfil() {
     <p><strong>📧 Email:</strong> ${perfilUsuario.email}</p>
     <p><strong>📅 Miembro desde:</strong> ${new Date(perfilUsuario.fecha_creacion).toLocaleDateString('es-ES')}</p>
     <p><strong>📊 Hábitos programados:</strong> ${habits.length}</p>
-    <p><strong>📈 Historial de hábitos:</strong> ${activities.length}</p>
+    <p><strong>📈 Historial de hábitos:</strong> ${resumenUsuario ? resumenUsuario.total_historial : activities.length}</p>
   `;
 }
 
@@ -308,6 +261,11 @@ async function saveActivity(habit, completed) {
   };
 
   activities.push(nuevaActividad);
+  if (resumenUsuario) {
+    resumenUsuario.total_historial++;
+    if (completed) resumenUsuario.completados++;
+    else resumenUsuario.no_completados++;
+  }
   renderActivities();
   
   // ✅ GUARDAR EN MYSQL CON FORM DATA
@@ -361,6 +319,12 @@ function renderActivities() {
       </div>`;
   });
 
+  // La lista solo trae el historial reciente: los totales vienen del resumen del servidor
+  if (resumenUsuario) {
+    doneCount = elements.filterSelect.value === "fail" ? 0 : resumenUsuario.completados;
+    failCount = elements.filterSelect.value === "done" ? 0 : resumenUsuario.no_completados;
+  }
+
   if (elements.activityCounters) {
     elements.activityCounters.textContent =
       `✅ Cumplidos: ${doneCount} | ❌ No cumplidos: ${failCount}`;
@@ -704,22 +668,13 @@ async function sincronizarHabitos() {
     showModal('🔄 Sincronizando hábitos...');
     console.log('Sincronizando hábitos para usuario:', usuarioActual.id);
 
-    // Recargar hábitos programados
-    console.log('Cargando hábitos programados...');
-    await cargarHabitosProgramados();
-    console.log('Hábitos programados cargados:', habits.length);
-
-    // Recargar historial
-    console.log('Cargando historial...');
-    await cargarHistorialDesdeMySQL();
-    console.log('Historial cargado:', activities.length);
-
-    // Actualizar información del perfil
-    console.log('Actualizando perfil...');
+    // Recargar perfil, hábitos e historial
     await cargarPerfilUsuario();
+    const totalHistorial = resumenUsuario ? resumenUsuario.total_historial : activities.length;
+    console.log('Hábitos:', habits.length, '| Historial:', totalHistorial);
 
     closeModal();
-    showModal(`✅ Hábitos sincronizados correctamente\nHábitos: ${habits.length} | Historial: ${activities.length}`);
+    showModal(`✅ Hábitos sincronizados correctamente\nHábitos: ${habits.length} | Historial: ${totalHistorial}`);
 
   } catch (error) {
     console.error('Error sincronizando hábitos:', error);